@@ -0,0 +1,160 @@
+"""
+_core.py – Integer-only Connect 4 search used by game.py.
+
+Works on bitboards only (one int per player, same layout as Connect4 in game.py),
+so every function can be compiled with Numba's @njit for fast dataset generation.
+
+Includes:
+- Board constants & precomputed window masks
+- 4-in-a-row & winning move checks
+- Evaluation function
+- Negamax with alpha-beta pruning
+
+If Numba isn't installed the same functions run as normal Python.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError: # Numba is optional - fall back to plain Python
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func # Return function unchanged
+
+COLUMN_COUNT = 7
+ROW_COUNT = 6
+COLUMN_BITS = ROW_COUNT + 1 # Each column uses 7 bits (6 rows + empty sentinel bit on top)
+
+WIN_SCORE = 100000 # Score for a win found during search (much higher than any evaluation score)
+INFINITY = 1_000_000_000 # Used instead of math.inf so all scores stay integers (needed for Numba)
+
+# Bit distance between neighbouring cells in each direction:
+# 1 = vertical |, 7 = horizontal -, 6 = diagonal \, 8 = diagonal /
+WIN_SHIFTS = (1, COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1)
+
+# Move-ordering - centre columns first
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+# Per-column masks
+BOTTOM_MASKS = tuple(1 << (col * COLUMN_BITS) for col in range(COLUMN_COUNT)) # Bottom cell
+TOP_MASKS = tuple(1 << (col * COLUMN_BITS + ROW_COUNT - 1) for col in range(COLUMN_COUNT)) # Top cell
+COLUMN_MASKS = tuple(((1 << ROW_COUNT) - 1) << (col * COLUMN_BITS) for col in range(COLUMN_COUNT)) # All 6 cells
+FULL_BOARD = sum(COLUMN_MASKS)
+BOTTOM_ROW = sum(BOTTOM_MASKS)
+
+# Every possible set of 4 cells in a row as a bitmask (69 in total)
+# Built once at import so evaluate only has to AND & count bits
+def build_windows():
+    windows = []
+    directions = [(1, 0), (0, 1), (1, 1), (1, -1)] # (column step, row step): -, |, /, \
+    for col in range(COLUMN_COUNT):
+        for row in range(ROW_COUNT):
+            for col_step, row_step in directions:
+                end_col = col + 3 * col_step
+                end_row = row + 3 * row_step
+                if 0 <= end_col < COLUMN_COUNT and 0 <= end_row < ROW_COUNT: # Window fits on board
+                    mask = 0
+                    for i in range(4):
+                        mask |= 1 << ((col + i * col_step) * COLUMN_BITS + row + i * row_step)
+                    windows.append(mask)
+    return tuple(windows)
+
+WINDOWS = build_windows()
+
+# Count set bits
+# - Python: int.bit_count() is already a single C call
+# - Numba: int.bit_count() isn't supported, LLVM turns this loop into a single popcount instruction
+if HAS_NUMBA:
+    @njit(cache=True)
+    def popcount(x):
+        count = 0
+        while x:
+            x &= x - 1 # Clear lowest set bit
+            count += 1
+        return count
+else:
+    popcount = int.bit_count
+
+# Checks for 4 in a row using bit shifts (see WIN_SHIFTS)
+# - m = bb & (bb >> d) marks discs that have a matching disc d bits away (2 in a row)
+# - m & (m >> 2 * d) marks pairs followed by another pair (4 in a row)
+# The empty sentinel bit on top of each column stops lines wrapping into the next column
+@njit(cache=True)
+def has_won(bb):
+    for d in WIN_SHIFTS:
+        m = bb & (bb >> d)
+        if m & (m >> (2 * d)):
+            return True # Found 4 in a row - win
+    return False # No winner
+
+# Cells a disc can be dropped into right now (lowest empty cell of each column that isn't full)
+# Adding the bottom row carries up each column to its first empty cell, full columns carry into the sentinel bit
+@njit(cache=True)
+def playable_cells(occupied):
+    return (occupied + BOTTOM_ROW) & FULL_BOARD
+
+# Empty cells that would complete 4 in a row for player_bb (whether or not a disc can land there yet)
+# For each direction finds cells with 3 of player's discs next to them: 3 on one side, or 2 + 1, or 1 + 2
+@njit(cache=True)
+def winning_cells(player_bb, occupied):
+    # Vertical - 3 discs directly below
+    cells = (player_bb << 1) & (player_bb << 2) & (player_bb << 3)
+
+    # Horizontal & diagonals
+    for d in WIN_SHIFTS[1:]:
+        pair = (player_bb << d) & (player_bb << (2 * d)) # 2 discs on one side
+        cells |= pair & (player_bb << (3 * d)) # + 3rd disc on same side
+        cells |= pair & (player_bb >> d) # + 1 disc on other side
+        pair = (player_bb >> d) & (player_bb >> (2 * d)) # 2 discs on other side
+        cells |= pair & (player_bb << d)
+        cells |= pair & (player_bb >> (3 * d))
+
+    return cells & (FULL_BOARD ^ occupied) # Only empty cells on the board
+
+# Returns score showing how good the position is for player_bb
+# window_scores[player_count][opponent_count] = score of a window (WINDOW_SCORES in game.py)
+@njit(cache=True)
+def evaluate(player_bb, opponent_bb, window_scores):
+    score = 0
+    for window in WINDOWS:
+        score += window_scores[popcount(player_bb & window)][popcount(opponent_bb & window)]
+    return score
+
+# Negamax with alpha-beta pruning - the search used by Connect4.minimax_agent_move
+# player_bb - discs of player whose turn it is, opponent_bb - other player's discs
+# Bitboards are ints, so making a move creates new values instead of changing & undoing the board
+# Returns (best move, score for player to move) - best move is -1 if no move was chosen
+@njit(cache=True)
+def negamax(player_bb, opponent_bb, alpha, beta, depth, window_scores):
+    occupied = player_bb | opponent_bb
+
+    # Stop search if searched deep enough or board full
+    if depth == 0 or occupied == FULL_BOARD:
+        return -1, evaluate(player_bb, opponent_bb, window_scores)
+
+    best_move = -1
+    for col in MOVE_ORDER:
+        if occupied & TOP_MASKS[col]: # Column full
+            continue
+
+        # Adding bottom bit to occupied cells carries up to the lowest empty cell in this column
+        move = (occupied + BOTTOM_MASKS[col]) & COLUMN_MASKS[col]
+        new_player_bb = player_bb | move
+
+        # Winning move - no need to search further (quicker wins score higher)
+        if has_won(new_player_bb):
+            return col, WIN_SCORE + depth
+
+        _, score = negamax(opponent_bb, new_player_bb, -beta, -alpha, depth - 1, window_scores)
+        score = -score # Other player's score is the opposite of ours
+
+        # Prune search - other player would never allow this position
+        if score >= beta:
+            return col, beta
+
+        if score > alpha:
+            alpha = score
+            best_move = col
+
+    return best_move, alpha
@@ -20,31 +20,117 @@ Not intended for gameplay; used as a backend logic module for training purposes
 
 import random
 import time
-import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 from colorama import Fore, Style, init # For colours
 init(autoreset=True) # Reset colour after each print
 import joblib
-model = joblib.load("ml_agent.pkl")
+import numpy as np
+import _core # Bitboard search functions (compiled with Numba if installed)
+from _core import COLUMN_COUNT, ROW_COUNT
 
 PLAYER_1_COLOUR = Fore.GREEN
 PLAYER_2_COLOUR = Fore.BLUE
 ERROR_COLOUR = Fore.RED
 AI_COLOUR = Fore.YELLOW
-COLUMN_COUNT = 7
-ROW_COUNT = 6
+MAX_DEPTH = 3 # How many moves ahead minimax_agent_move looks
+
+# ML model is only loaded the first time the ML agent is used (see get_predict_fn)
+# so importing game.py for minimax labelling doesn't pay for loading it
+model = None
+predict_fn = None
+
+def get_model():
+    global model
+    if model is None:
+        model = joblib.load("ml_agent.pkl")
+    return model
+
+# Returns function that predicts a column from one board (array of shape (1, 42))
+# model.predict() validates & converts its input on every call, which takes much longer than the prediction itself
+# for a single board, so decision trees are predicted from the fitted tree directly
+def build_predict_fn(loaded_model):
+    from sklearn.pipeline import Pipeline # Imported here so sklearn is also only loaded when needed
+    from sklearn.tree import DecisionTreeClassifier
+
+    estimator = loaded_model
+    if isinstance(loaded_model, Pipeline) and len(loaded_model.steps) == 1: # Pipeline with no preprocessing steps
+        estimator = loaded_model.steps[0][1]
+
+    if isinstance(estimator, DecisionTreeClassifier) and estimator.n_outputs_ == 1:
+        tree = estimator.tree_
+        classes = estimator.classes_
+
+        # tree.predict gives fraction of each class in the leaf the board lands in - pick the largest
+        # (same as DecisionTreeClassifier.predict, without input checks - input must be float32)
+        def predict_tree(board_input):
+            return classes[tree.predict(board_input).argmax()]
+        return predict_tree
+
+    # Any other model - use normal predict
+    def predict_model(board_input):
+        return loaded_model.predict(board_input)[0]
+    return predict_model
+
+# Predict function for the loaded model - built on first use, then reused
+def get_predict_fn():
+    global predict_fn
+    if predict_fn is None:
+        predict_fn = build_predict_fn(get_model())
+    return predict_fn
+
+# Bit index of each cell in the order the ML model expects (row by row from the top, left to right)
+ML_BITS = np.array([col * (ROW_COUNT + 1) + (ROW_COUNT - 1 - row) for row in range(ROW_COUNT) for col in range(COLUMN_COUNT)], dtype=np.int64)
 
 class Connect4:
+
+    # Fixed list of instance attributes (no per-instance __dict__) - faster attribute access during search
+    # board isn't listed because it's a property decoded from p1 & p2
+    __slots__ = ("p1", "p2", "heights", "ml_input", "interactive")
     
     # Constants: Fixed values that do not change during execution
     PLAYER_1 = "●" # Human
     PLAYER_2 = "○" # AI
-
-    # Initialise a 6-row by 7-column empty board as a nested list:
-    # - Inner loop (for _ in range(7)) creates a row of 7 spaces
-    # - Outer loop (for _ in range(6)) repeats this process for 6 rows
+    MOVE_ORDER = _core.MOVE_ORDER # Move-ordering - centre columns first (3 = best)
+
+    # Board is stored as two bitboards (one int per player) instead of a nested list
+    # Bit layout - each column uses 7 bits (6 rows + 1 empty sentinel bit on top):
+    #
+    #   6 13 20 27 34 41 48   <- sentinel row (always empty)
+    #   5 12 19 26 33 40 47   <- top row
+    #   4 11 18 25 32 39 46
+    #   3 10 17 24 31 38 45
+    #   2  9 16 23 30 37 44
+    #   1  8 15 22 29 36 43
+    #   0  7 14 21 28 35 42   <- bottom row
+    #
+    # - p1 / p2: bit is set if that player has a disc there
+    # - heights: number of discs in each column (next free bit = column * 7 + height)
+    # interactive - True when a person is playing: AI pauses before moving & turns/moves are announced
+    #   Left False when games are run in bulk (e.g. dataset generation) so nothing slows them down
     # 'self' = instance of the class, allowing access to its attributes & methods
-    def __init__(self):
-        self.board = [[" " for _ in range(COLUMN_COUNT)] for _ in range(ROW_COUNT)]
+    def __init__(self, interactive=False):
+        self.interactive = interactive
+        self.p1 = 0 # Player 1's discs
+        self.p2 = 0 # Player 2's discs
+        self.heights = [0] * COLUMN_COUNT
+        self.ml_input = np.empty((1, ROW_COUNT * COLUMN_COUNT), dtype=np.float32) # Reused for every ML prediction (float32 = dtype trees use)
+
+    # Decode bitboards into a 6x7 nested list (row 0 = top) - only used for display & ML features
+    @property
+    def board(self):
+        # Read attributes once instead of for every cell
+        p1, p2 = self.p1, self.p2
+        player_1, player_2 = self.PLAYER_1, self.PLAYER_2
+
+        board = []
+        for row in range(ROW_COUNT):
+            bit = ROW_COUNT - 1 - row # Row 0 (top) is bit 5 in each column
+            board.append([
+                player_1 if p1 >> col_bit & 1 else player_2 if p2 >> col_bit & 1 else " "
+                for col_bit in range(bit, COLUMN_COUNT * (ROW_COUNT + 1), ROW_COUNT + 1) # Same row in each column
+            ])
+        return board
 
     def display_board(self):
         print("\n  0  1  2  3  4  5  6")
@@ -55,94 +141,63 @@ class Connect4:
         print("\n")
 
     def drop_disc(self, column, player_symbol):
-        row = self.get_lowest_empty_row(column)
-        if row is not None:
-            self.board[row][column] = player_symbol
-            return True
-        return False
+        if not self.is_valid_move(column):
+            return False
+        self.make_move(column, 1 if player_symbol == self.PLAYER_2 else 0)
+        return True
+
+    # Place disc for player (0 = PLAYER_1, 1 = PLAYER_2) - no validity check
+    # Only the one changed bit is updated in the bitboard (XOR), rather than rebuilding it
+    def make_move(self, column, player):
+        bit = column * (ROW_COUNT + 1) + self.heights[column] # Lowest empty bit in column
+        self.heights[column] += 1
+        if player:
+            self.p2 ^= 1 << bit
+        else:
+            self.p1 ^= 1 << bit
+
+    # Remove player's top disc from column (undo make_move)
+    def unmake_move(self, column, player):
+        self.heights[column] -= 1
+        bit = column * (ROW_COUNT + 1) + self.heights[column]
+        if player:
+            self.p2 ^= 1 << bit
+        else:
+            self.p1 ^= 1 << bit
+
+    # Set up board from two bitboards (e.g. a position sent to another process)
+    # heights are rebuilt from the discs on the board
+    def set_bitboards(self, p1, p2):
+        self.p1 = p1
+        self.p2 = p2
+        occupied = p1 | p2
+        for col in range(COLUMN_COUNT):
+            self.heights[col] = (occupied & _core.COLUMN_MASKS[col]).bit_count() # Discs in column
 
     # Check if column is full - returns Boolean
     def is_valid_move(self, column):
-        return self.board[0][column] == " " # Checks top row (row index 0)
+        return self.heights[column] < ROW_COUNT
     
+    # Checks for 4 in a row on player's bitboard (see _core.has_won)
     def check_winner(self, player_symbol):
-
-        # Check for horizontal win -
-        for row in range(ROW_COUNT): # Iterate through all 6 rows
-            for col in range(COLUMN_COUNT - 3): # Only check up to col index 3, otherwise it'll be out of bounds
-
-                # Check if this position & the next 3 to the right match the player's symbol
-                # - col + 0: 1st symbol in sequence, col + 1: 2nd symbol, & so on
-                if all(self.board[row][col + i] == player_symbol for i in range(4)):
-                    return True # Found 4 in a row - win
-                
-        # Check for vertical win |
-        for col in range(COLUMN_COUNT):
-            for row in range(ROW_COUNT - 3): # Only check up to row index 2
-                if all (self.board[row + i][col] == player_symbol for i in range(4)):
-                    return True
-                
-        # Check for diagonal win /
-        for row in range(3, ROW_COUNT): # Check from rows 3-5 to ensure enough space above for win
-            for col in range(COLUMN_COUNT - 3):
-
-                # Check if 4 pieces match diagonally (bottom-left -> top-right)
-                # - row - i moves up (decrease row index)
-                # - col + i moves right (increase column index)
-                if all(self.board[row - i][col + i] == player_symbol for i in range(4)):
-                    return True
-                
-        # Check for diagonal win \
-        for row in range(3, ROW_COUNT):
-            for col in range(3, COLUMN_COUNT):
-
-                # Check if 4 pieces match diagonally (bottom-right -> top-left)
-                # - row - i moves up
-                # - col - i moves left
-                if all(self.board[row - i][col - i] == player_symbol for i in range(4)):
-                    return True
-        
-        return False # No winner
+        return _core.has_won(self.p2 if player_symbol == self.PLAYER_2 else self.p1)
     
     # Check if board is full = draw
     def is_full(self):
-        return all(self.board[0][col] != " " for col in range(COLUMN_COUNT))
+        return sum(self.heights) == ROW_COUNT * COLUMN_COUNT
     
     # Evaluates board for player_symbol (AI or human)
     # Returns score showing how good the position is for the player
     def evaluate_board(self, player_symbol):
-        opponent_symbol = self.PLAYER_1 if player_symbol == self.PLAYER_2 else self.PLAYER_2 # Check which symbol belongs to opponent
-        score = 0 # Can increase or decrease
-
-        # Extract every possible horizontal set of 4 pieces
-        for row in range(ROW_COUNT):
-            for col in range(COLUMN_COUNT - 3):
-                window = [self.board[row][col + i] for i in range(4)] # Get 4 in a row sequence
-                score += self.assess_pattern(player_symbol, opponent_symbol, window) # Call assess_pattern to analyse how strong pattern is
-
-        # Extract every possible vertical set of 4 pieces
-        for col in range(COLUMN_COUNT):
-            for row in range(ROW_COUNT - 3):
-                window = [self.board[row + i][col] for i in range(4)]
-                score += self.assess_pattern(player_symbol, opponent_symbol, window)
-
-        # Extract every possible diagonal / set of 4 pieces
-        for row in range(3, ROW_COUNT):
-            for col in range(COLUMN_COUNT - 3):
-                window = [self.board[row - i][col + i] for i in range(4)]
-                score += self.assess_pattern(player_symbol, opponent_symbol, window)
-
-        # Extract every possible diagonal \ set of 4 pieces
-        for row in range(3, ROW_COUNT):
-            for col in range(3, COLUMN_COUNT):
-                window = [self.board[row - i][col - i] for i in range(4)]
-                score += self.assess_pattern(player_symbol, opponent_symbol, window)
-
-        return score
+        if player_symbol == self.PLAYER_2:
+            return _core.evaluate(self.p2, self.p1, WINDOW_SCORES)
+        return _core.evaluate(self.p1, self.p2, WINDOW_SCORES)
     
+    # Only used to build WINDOW_SCORES (evaluate_board looks scores up from that table)
     # window = list of 4 consecutive cells
     # Returns score showing how good or bad this sequence of 4 is
-    def assess_pattern(self, player_symbol, opponent_symbol, window):
+    @staticmethod
+    def assess_pattern(player_symbol, opponent_symbol, window):
         score = 0
         opponent_count = window.count(opponent_symbol)
         player_count = window.count(player_symbol)
@@ -169,76 +224,15 @@ class Connect4:
         # AI will choose move that maximises this
         return score
     
-    # maximising_player - True if AI's turn, False if opponent's turn
-    # Depth - controls how many moves ahead the AI looks
-    # alpha = -∞ (worst possible start for maximising)
-    # beta = ∞ (worst possible start for minimising)
+    # AI chooses best move using minimax (negamax with alpha-beta pruning, see _core.negamax)
+    # Searches MAX_DEPTH moves ahead - compiled with Numba if installed, otherwise runs as normal Python
+    # If several moves are equally good, the first one in MOVE_ORDER (centre first) is chosen
 
     # === Reference for alpha beta pruning: Science Buddies YouTube tutorial on minimax with alpha-beta pruning ===
     #   https://www.youtube.com/watch?v=rbmk1qtVEmg
-    def minimax_agent(self, alpha, beta, maximising_player, depth):
-
-        valid_moves = [col for col in range(COLUMN_COUNT) if self.is_valid_move(col)] # Find all columns where move is possible (not full)
-
-        # Move-ordering - sort moves (centre first)
-        priority_order = [3, 2, 4, 1, 5, 0, 6] # 3 = index 0 (best)
-
-        # Sort valid moves based on position in priority_order list
-        # lambda col: priority_order.index(col) gives priority ranking for each column
-        # sorted() rearranges valid_moves so centre columns come first
-        valid_moves = sorted(valid_moves, key=lambda col: priority_order.index(col))
-
-        # Stop search if AI searched deep enough or board full
-        if depth == 0 or self.is_full():
-            return None, self.evaluate_board(self.PLAYER_2) # None because it's an evaluation, not selecting a move
-        
-        if maximising_player:
-            best_score = float('-inf') # Start off as negative infinity because AI wants highest possible score
-            best_move = None
-            for col in valid_moves:
-                row = self.get_lowest_empty_row(col)
-                self.board[row][col] = self.PLAYER_2 # AI makes move (place disc in lowest available row)
-                _, score = self.minimax_agent(alpha, beta, False, depth - 1) # Simulate to see how opponent would respond
-                self.board[row][col] = " " # Undo move so to not change the real
-
-                # If this move gives higher score than best score
-                if score > best_score:
-                    best_score = score # Store new best score
-                    best_move = col # Best column to play
-                alpha = max(alpha, best_score)
-
-                # Prune search if alpha value is greater than or equal to beta
-                if alpha >= beta:
-                    break
-
-            return best_move, best_score
-        
-        else:
-            best_score = float('inf') # Positive infinity because opponent tries to minimise AI's score
-            best_move = None
-
-            # Tries every possible move for opponent (PLAYER_1)
-            for col in valid_moves:
-                row = self.get_lowest_empty_row(col)
-                self.board[row][col] = self.PLAYER_1 # Opponent makes move
-                _, score = self.minimax_agent(alpha, beta, True, depth - 1) # Simulate AI's response
-                self.board[row][col] = " "
-
-                # Opponent chooses move that lowest AI's score the most
-                if score < best_score:
-                    best_score = score
-                    best_move = col
-
-                beta = min(beta, best_score)
-                if alpha >= beta:
-                    break
-
-            return best_move, best_score
-        
-    # AI chooses best move using minimax
     def minimax_agent_move(self):
-        best_move, _ = self.minimax_agent(-math.inf, math.inf, True, 3)
-        return best_move if best_move is not None else self.random_agent()
+        best_move, _ = _core.negamax(self.p2, self.p1, -_core.INFINITY, _core.INFINITY, MAX_DEPTH, WINDOW_SCORES)
+        return best_move if best_move != -1 else self.random_agent()
             
     # AI chooses random move
     def random_agent(self):
@@ -250,16 +244,17 @@ class Connect4:
         return None
     
     # For smart agent method
+    # Bitmask of cells where player_symbol can drop a disc & win straight away
+    def winning_moves(self, player_symbol):
+        player_bb = self.p2 if player_symbol == self.PLAYER_2 else self.p1
+        occupied = self.p1 | self.p2
+        return _core.winning_cells(player_bb, occupied) & _core.playable_cells(occupied)
+
     def find_winning_move(self, player_symbol):
-        for col in range(COLUMN_COUNT):
-            if self.is_valid_move(col):
-                row = self.get_lowest_empty_row(col)
-                if row is not None:
-                    self.board[row][col] = player_symbol # Place disc temporarily
-                    if self.check_winner(player_symbol):
-                        self.board[row][col] = " " # Undo move
-                        return col # Winning column
-                    self.board[row][col] = " "
+        moves = self.winning_moves(player_symbol)
+        if moves:
+            lowest_bit = (moves & -moves).bit_length() - 1 # Lowest winning cell = leftmost column
+            return lowest_bit // (ROW_COUNT + 1) # Winning column
         return None # No winning move
 
     def smart_agent(self):
@@ -279,11 +274,12 @@ class Connect4:
 
 # Uses dataset from https://archive.ics.uci.edu/dataset/26/connect+4
     def ml_agent_predict(self):
-        # Flatten board & convert symbols to numeric
-        flat_board = [self.convert_symbol(cell) for row in self.board for cell in row]
+        # Flatten board & convert to numeric (same values as convert_symbol: PLAYER_1 = 1, PLAYER_2 = -1, empty = 0)
+        # Filled straight from the bitboards into the same array each time
+        self.ml_input[0] = ((self.p1 >> ML_BITS) & 1) - ((self.p2 >> ML_BITS) & 1)
 
         # Predict best column using trained ML model
-        prediction = model.predict([flat_board])[0]
+        prediction = get_predict_fn()(self.ml_input)
 
         # Convert from str to int
         column = int(prediction)
@@ -309,7 +305,8 @@ class Connect4:
 
         # Run until win or board is full
         while True:
-            self.announce_turn(turn)
+            if self.interactive:
+                self.announce_turn(turn)
             self.display_board() # Show state of board before each turn
 
             # Check for draw
@@ -342,8 +339,9 @@ class Connect4:
                         print(ERROR_COLOUR + "Oops! Please enter a number between 0 and 6.\n")
             
             else: # AI's turn
-                print(AI_COLOUR + f"AI ({self.PLAYER_2}) is thinking...\n")
-                time.sleep(1)
+                if self.interactive:
+                    print(AI_COLOUR + f"AI ({self.PLAYER_2}) is thinking...\n")
+                    time.sleep(1)
 
                 column = self.minimax_agent_move()
                 # column = self.ml_agent_predict()
@@ -357,7 +355,8 @@ class Connect4:
 
             # Make a move
             if self.drop_disc(column, current_player): # If move is valid
-                self.announce_move(turn, column) # Announce the move that was made
+                if self.interactive:
+                    self.announce_move(turn, column) # Announce the move that was made
 
                 if self.check_winner(current_player):
                     self.display_board()
@@ -367,15 +366,9 @@ class Connect4:
                 turn += 1 # Switch to next player's turn (even is player 1, odd is player 2)
 
     def get_lowest_empty_row(self, column):
-
-        # range (start, stop, step):
-        # - Start from bottom row (5)
-        # - Run until row 0, stop before -1 (makes sure all 6 rows are checked (5-0))
-        # - Moves backward (from bottom to top)
-        for row in range(ROW_COUNT - 1, -1, -1):
-            if self.board[row][column] == " ": # Check if slot is empty
-                return row
-        return None # Column is full
+        if not self.is_valid_move(column):
+            return None # Column is full
+        return ROW_COUNT - 1 - self.heights[column] # Row index counted from top (row 0)
     
     # Print whose turn it is
     def announce_turn(self, turn):
@@ -395,9 +388,40 @@ class Connect4:
             print((PLAYER_2_COLOUR + f"AI ({self.PLAYER_2}) placed a disc in column {column}.").center(40))
         print("-" * 40 + "\n")
     
+# Score of a window, indexed by [player_count][opponent_count]
+# e.g. WINDOW_SCORES[3][0] = 10 (3 player discs + 1 empty space)
+# Tuples so it can be passed to Numba-compiled _core functions
+WINDOW_SCORES = tuple(
+    tuple(
+        Connect4.assess_pattern("p", "o", ["p"] * player_count + ["o"] * opponent_count + [" "] * (4 - player_count - opponent_count))
+        if player_count + opponent_count <= 4 else 0 # Impossible - window only has 4 cells
+        for opponent_count in range(5)
+    )
+    for player_count in range(5)
+)
+
+# Labels one position with minimax's best move for the AI (PLAYER_2)
+# position = (p1, p2) bitboards - ints are cheap to send to worker processes
+def label_one_position(position):
+    game = Connect4()
+    game.set_bitboards(*position)
+    return game.minimax_agent_move()
+
+# Labels many positions - returns best moves in the same order as positions
+# max_workers = 1 (default) labels them one by one in this process
+# max_workers > 1 (or None = one per CPU core) splits them across processes, as each position is searched independently
+# (threads wouldn't help: Python's GIL only lets one thread run Python code at a time)
+# Starting processes takes longer than labelling a few thousand boards with Numba, so only worth it for big/deep runs
+def label_positions(positions, max_workers=1, chunksize=64):
+    if max_workers == 1:
+        return [label_one_position(position) for position in positions]
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return list(executor.map(label_one_position, positions, chunksize=chunksize))
+
 # Start game
 if __name__ == "__main__":
-    game = Connect4()
+    game = Connect4(interactive=True)
     game.play()
 
 
@@ -0,0 +1,161 @@
+# Tests for game.py
+# Run with: python -m pytest test_game.py
+
+import random
+import _core
+from game import Connect4, MAX_DEPTH, ROW_COUNT, COLUMN_COUNT
+from _core import WIN_SCORE
+
+# Random boards made the same way as generate_minimax_dataset.ipynb (seeded so they're the same every run)
+def generate_boards(count, seed=0, min_moves=6, max_moves=20):
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        game = Connect4()
+        current_player = game.PLAYER_1
+        for _ in range(rng.randint(min_moves, max_moves)):
+            valid_columns = [col for col in range(7) if game.is_valid_move(col)]
+            if not valid_columns:
+                break
+            game.drop_disc(rng.choice(valid_columns), current_player)
+            current_player = game.PLAYER_2 if current_player == game.PLAYER_1 else game.PLAYER_1
+        if not game.is_full():
+            boards.append(game)
+    return boards
+
+# Random boards that can go on after a win (to test win checks with several lines on the board)
+# Also returns the nested-list board built the same way as the original drop_disc (row 0 = top)
+def generate_long_boards(count, seed=1):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        game = Connect4()
+        grid = [[" " for _ in range(COLUMN_COUNT)] for _ in range(ROW_COUNT)]
+        current_player = game.PLAYER_1
+        for _ in range(rng.randint(0, 42)):
+            valid_columns = [col for col in range(COLUMN_COUNT) if game.is_valid_move(col)]
+            if not valid_columns:
+                break
+            col = rng.choice(valid_columns)
+            game.drop_disc(col, current_player)
+            row = max(row for row in range(ROW_COUNT) if grid[row][col] == " ") # Lowest empty row
+            grid[row][col] = current_player
+            current_player = game.PLAYER_2 if current_player == game.PLAYER_1 else game.PLAYER_1
+        boards.append((game, grid))
+    return boards
+
+# === Reference versions of the original nested-list code ===
+
+def reference_check_winner(board, symbol):
+    for row in range(ROW_COUNT):
+        for col in range(COLUMN_COUNT):
+            for row_step, col_step in ((0, 1), (1, 0), (-1, 1), (-1, -1)):
+                cells = [(row + i * row_step, col + i * col_step) for i in range(4)]
+                if all(0 <= r < ROW_COUNT and 0 <= c < COLUMN_COUNT and board[r][c] == symbol for r, c in cells):
+                    return True
+    return False
+
+def reference_evaluate_board(board, symbol, opponent):
+    score = 0
+    for row in range(ROW_COUNT):
+        for col in range(COLUMN_COUNT):
+            for row_step, col_step in ((0, 1), (1, 0), (-1, 1), (-1, -1)):
+                cells = [(row + i * row_step, col + i * col_step) for i in range(4)]
+                if all(0 <= r < ROW_COUNT and 0 <= c < COLUMN_COUNT for r, c in cells):
+                    window = [board[r][c] for r, c in cells]
+                    score += Connect4.assess_pattern(symbol, opponent, window)
+    return score
+
+def reference_find_winning_move(board, symbol):
+    for col in range(COLUMN_COUNT):
+        empty_rows = [row for row in range(ROW_COUNT) if board[row][col] == " "]
+        if empty_rows:
+            board[empty_rows[-1]][col] = symbol # Place disc temporarily
+            won = reference_check_winner(board, symbol)
+            board[empty_rows[-1]][col] = " "
+            if won:
+                return col
+    return None
+
+# === Board logic ===
+
+def test_board_matches_nested_list():
+    for game, grid in generate_long_boards(500):
+        assert game.board == grid
+        assert game.is_full() == all(cell != " " for cell in grid[0])
+        for col in range(COLUMN_COUNT):
+            assert game.is_valid_move(col) == (grid[0][col] == " ")
+            empty_rows = [row for row in range(ROW_COUNT) if grid[row][col] == " "]
+            assert game.get_lowest_empty_row(col) == (empty_rows[-1] if empty_rows else None)
+
+def test_check_winner():
+    wins = 0
+    for game, grid in generate_long_boards(1500):
+        for symbol in (game.PLAYER_1, game.PLAYER_2):
+            expected = reference_check_winner(grid, symbol)
+            assert game.check_winner(symbol) == expected
+            wins += expected
+    assert wins > 0 # Make sure winning boards were actually tested
+
+def test_evaluate_board():
+    assert len(_core.WINDOWS) == 69
+    for game, grid in generate_long_boards(1500):
+        assert game.evaluate_board(game.PLAYER_2) == reference_evaluate_board(grid, game.PLAYER_2, game.PLAYER_1)
+        assert game.evaluate_board(game.PLAYER_1) == reference_evaluate_board(grid, game.PLAYER_1, game.PLAYER_2)
+
+def test_playable_cells():
+    for game, _ in generate_long_boards(500):
+        expected = 0
+        for col in range(COLUMN_COUNT):
+            if game.is_valid_move(col):
+                expected |= 1 << (col * (ROW_COUNT + 1) + game.heights[col])
+        assert _core.playable_cells(game.p1 | game.p2) == expected
+
+def test_find_winning_move():
+    for game, grid in generate_long_boards(1500):
+        for symbol in (game.PLAYER_1, game.PLAYER_2):
+            if reference_check_winner(grid, symbol):
+                continue # Already won - original returned any column here
+            assert game.find_winning_move(symbol) == reference_find_winning_move(grid, symbol)
+
+def test_ml_input_order():
+    for game, grid in generate_long_boards(200):
+        game.ml_agent_predict()
+        assert list(game.ml_input[0]) == [game.convert_symbol(cell) for row in grid for cell in row]
+
+def test_set_bitboards():
+    for game, grid in generate_long_boards(500):
+        copy = Connect4()
+        copy.set_bitboards(game.p1, game.p2)
+        assert copy.heights == game.heights
+        assert copy.board == grid
+
+# === Minimax ===
+
+# Plain minimax (no pruning) - tries every move to depth, scoring wins & leaves the same way as the search
+# Returns (first best move in MOVE_ORDER, score for AI)
+def brute_force_minimax(game, maximising_player, depth):
+    if depth == 0 or game.is_full():
+        return None, game.evaluate_board(game.PLAYER_2)
+
+    player = 1 if maximising_player else 0
+    symbol = game.PLAYER_2 if maximising_player else game.PLAYER_1
+    best_move, best_score = None, None
+    for col in Connect4.MOVE_ORDER:
+        if not game.is_valid_move(col):
+            continue
+        game.make_move(col, player)
+        if game.check_winner(symbol):
+            score = WIN_SCORE + depth if maximising_player else -(WIN_SCORE + depth)
+        else:
+            _, score = brute_force_minimax(game, not maximising_player, depth - 1)
+        game.unmake_move(col, player)
+
+        if best_score is None or (score > best_score if maximising_player else score < best_score):
+            best_move, best_score = col, score
+    return best_move, best_score
+
+def test_minimax_agent_move_matches_brute_force():
+    for game in generate_boards(100):
+        expected, _ = brute_force_minimax(game, True, MAX_DEPTH)
+        assert game.minimax_agent_move() == expected